@@ -1,3 +1,23 @@
-from setuptools import setup;
+import os
+from setuptools import setup, Extension
 
-setup()
+ext_modules = []
+if os.environ.get('GESTURES4KIVY_COMPILE'):
+    # Optional, desktop only. The default build is pure Python,
+    # which Android and iOS require.
+    # Arithmetic helpers in C, if this fails to build Python is used.
+    ext_modules.append(Extension('gestures4kivy._gest_c',
+                                 ['src/gestures4kivy/_gest_c.c'],
+                                 optional=True))
+    # The gesture state machine, if Cython is installed.
+    try:
+        from Cython.Build import cythonize
+    except ImportError:
+        pass
+    else:
+        ext_modules += cythonize(
+            [Extension('gestures4kivy.commongestures',
+                       ['src/gestures4kivy/commongestures.py'])],
+            compiler_directives={'language_level': 3})
+
+setup(ext_modules=ext_modules)
@@ -0,0 +1,108 @@
+/*
+ * Compiled arithmetic for commongestures.py
+ *
+ * Optional, see setup.py. commongestures.py has a Python version of each
+ * function, used if this extension is not built.
+ */
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <math.h>
+
+#ifndef M_PI
+#define M_PI 3.14159265358979323846
+#endif
+
+/* Unpack n float arguments */
+static int
+unpack(PyObject *args, Py_ssize_t n, double *out)
+{
+    Py_ssize_t i;
+
+    if (PyTuple_GET_SIZE(args) != n) {
+        PyErr_Format(PyExc_TypeError, "expected %zd arguments, got %zd",
+                     n, PyTuple_GET_SIZE(args));
+        return -1;
+    }
+    for (i = 0; i < n; i++) {
+        out[i] = PyFloat_AsDouble(PyTuple_GET_ITEM(args, i));
+        if (out[i] == -1.0 && PyErr_Occurred())
+            return -1;
+    }
+    return 0;
+}
+
+/* velocity(x0, y0, t0, x1, y1, t1, inv_dpi), inches/sec */
+static PyObject *
+velocity(PyObject *self, PyObject *args)
+{
+    double a[7];
+    double period;
+
+    if (unpack(args, 7, a) < 0)
+        return NULL;
+    period = a[5] - a[2];
+    if (period == 0.0)
+        return PyFloat_FromDouble(0.0);
+    return PyFloat_FromDouble(hypot(a[3] - a[0], a[4] - a[1]) * a[6] /
+                              period);
+}
+
+/* distance_squared(x0, y0, x1, y1) */
+static PyObject *
+distance_squared(PyObject *self, PyObject *args)
+{
+    double a[4];
+    double dx, dy;
+
+    if (unpack(args, 4, a) < 0)
+        return NULL;
+    dx = a[0] - a[2];
+    dy = a[1] - a[3];
+    return PyFloat_FromDouble(dx * dx + dy * dy);
+}
+
+/* angle(x0, y0, x1, y1), degrees -180 to 180 */
+static PyObject *
+angle(PyObject *self, PyObject *args)
+{
+    double a[4];
+
+    if (unpack(args, 4, a) < 0)
+        return NULL;
+    return PyFloat_FromDouble(atan2(a[0] - a[2], a[1] - a[3]) *
+                              (180.0 / M_PI));
+}
+
+/* midpoint(x0, y0, x1, y1), (x, y) */
+static PyObject *
+midpoint(PyObject *self, PyObject *args)
+{
+    double a[4];
+
+    if (unpack(args, 4, a) < 0)
+        return NULL;
+    return Py_BuildValue("(dd)", (a[0] + a[2]) * 0.5, (a[1] + a[3]) * 0.5);
+}
+
+static PyMethodDef gest_c_methods[] = {
+    {"velocity", velocity, METH_VARARGS,
+     "velocity(x0, y0, t0, x1, y1, t1, inv_dpi), inches/sec"},
+    {"distance_squared", distance_squared, METH_VARARGS,
+     "distance_squared(x0, y0, x1, y1)"},
+    {"angle", angle, METH_VARARGS,
+     "angle(x0, y0, x1, y1), degrees -180 to 180"},
+    {"midpoint", midpoint, METH_VARARGS,
+     "midpoint(x0, y0, x1, y1), (x, y)"},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef gest_c_module = {
+    PyModuleDef_HEAD_INIT, "_gest_c", NULL, -1, gest_c_methods
+};
+
+PyMODINIT_FUNC
+PyInit__gest_c(void)
+{
+    return PyModule_Create(&gest_c_module);
+}
@@ -22,34 +22,216 @@ from kivy.clock import Clock
 from kivy.metrics import Metrics
 from kivy.config import Config
 from kivy.utils import platform
-from functools import partial
+from heapq import heappush, heappop
 from time import time
-from math import sqrt, atan, degrees
+from math import sqrt, hypot, atan2, degrees
+
+# Arithmetic helpers, compiled if the optional extension was built
+try:
+    from ._gest_c import velocity as _velocity
+    from ._gest_c import distance_squared as _distance_squared
+    from ._gest_c import angle as _angle
+    from ._gest_c import midpoint as _midpoint
+except ImportError:
+    def _velocity(x0, y0, t0, x1, y1, t1, inv_dpi):
+        # inches/sec
+        period = t1 - t0
+        if period:
+            return hypot(x1 - x0, y1 - y0) * inv_dpi / period
+        return 0.0
+
+    def _distance_squared(x0, y0, x1, y1):
+        return (x0 - x1) ** 2 + (y0 - y1) ** 2
+
+    def _angle(x0, y0, x1, y1):
+        # -180 to 180, defined for all positions
+        return degrees(atan2(x0 - x1, y0 - y1))
+
+    def _midpoint(x0, y0, x1, y1):
+        return (x0 + x1) * 0.5, (y0 + y1) * 0.5
+
+
+def _is_mouse(touch):
+    # Kivy's mouse provider touch.id is 'mouse<n>'.
+    # Test the id string once per touch, and save the result with the touch.
+    ud = touch.ud
+    is_mouse = ud.get('_g4k_mouse')
+    if is_mouse is None:
+        ud['_g4k_mouse'] = is_mouse = 'mouse' in str(touch.id)
+    return is_mouse
+
 
 # This must be global so that the state is shared between instances
 # For example, a SwipeScreen instance must know about the previous one.
 PREVIOUS_PAGE_START = 0
 
+# Platform, read once
+_IS_IOS = platform == 'ios'
+_IS_MOBILE = platform == 'android' or _IS_IOS
+_IS_MACOSX = platform == 'macosx'
+_IS_LINUX = platform == 'linux'
+
+# Gesture states
+_S_NONE = 0
+_S_LEFT = 1
+_S_RIGHT = 2
+_S_WHEEL = 3
+_S_LONG_PRESSED = 4
+_S_LONG_PRESS_MOVE = 5
+_S_DISAMBIGUATE = 6
+_S_MOVE = 7
+_S_SCALE = 8
+_S_SWIPE = 9
+
+# No pending deadline
+_NEVER = float('inf')
+
+# Modifier key bits
+_MOD_CTRL = 1
+_MOD_SHIFT = 2
+_MOD_ALT = 4
+
+# Mouse wheel touch.button: vertical, horizontal, negative, positive
+# negative inverts the scale, positive is the page and rotate direction
+_WHEEL_TABLE = {
+    'scrollup': (True, False, True, True),
+    'scrolldown': (True, False, False, False),
+    'scrollleft': (False, True, True, False),
+    'scrollright': (False, True, False, True),
+}
+_WHEEL_NONE = (False, False, False, False)
+
+
+class _GestureTimerQueue:
+    # Gesture timers for all CommonGestures instances.
+    # One Clock interval drains a heap of (deadline, token, callback, args),
+    # rather than every touch down scheduling its own Clock events.
+    # callback(*args, dt) is called, so no partial is built per timer.
+    # A timer is cancelled by recording its token, the entry is then
+    # skipped when it reaches the top of the heap.
+    # The same interval calls pollers, which check their own deadline
+    # and return False when done.
+    # The interval only runs while there are pending timers or pollers.
+
+    def __init__(self):
+        self._heap = []
+        self._cancelled = set()
+        self._pollers = set()
+        self._token = 0
+        self._event = None
+
+    def schedule(self, callback, timeout, *args):
+        self._token += 1
+        heappush(self._heap,
+                 (Clock.get_time() + timeout, self._token, callback, args))
+        self._start()
+        return self._token
+
+    def cancel(self, token):
+        self._cancelled.add(token)
+
+    def poll(self, callback):
+        self._pollers.add(callback)
+        self._start()
+
+    def _start(self):
+        if not self._event:
+            self._event = Clock.schedule_interval(self._drain, 1 / 60)
+
+    def _drain(self, dt):
+        now = Clock.get_time()
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            deadline, token, callback, args = heappop(heap)
+            if token in self._cancelled:
+                self._cancelled.discard(token)
+            else:
+                callback(*args, dt)
+        for callback in list(self._pollers):
+            if not callback():
+                self._pollers.discard(callback)
+        if not heap and not self._pollers:
+            self._cancelled.clear()
+            self._event = None
+            return False
+
+
+_GESTURE_TIMERS = _GestureTimerQueue()
+
 
 class CommonGestures(Widget):
 
+    # Instance attributes, slots are faster to read than the Widget __dict__
+    __slots__ = (
+        # platform
+        'mobile',
+        # modifier keys
+        '_mods', '_linux_caps_key',
+        # gesture state
+        '_touches', '_t0', '_t1', '_gesture_state',
+        '_px0', '_py0', '_px1', '_py1',
+        '_last_x', '_last_y', '_finger_distance_squared', '_finger_angle',
+        '_wheel_enabled', '_previous_wheel_time',
+        '_long_press_deadline', '_long_press_args', '_single_tap_schedule',
+        '_single_tap_args', '_swipe_schedule',
+        '_velx', '_vely', '_velt', '_velocity',
+        '_pending_move', '_pending_scale', '_move_trigger',
+        '_origin_x', '_origin_y',
+        # sensitivities
+        '_DOUBLE_TAP_TIME', '_DOUBLE_TAP_DISTANCE', '_LONG_MOVE_THRESHOLD',
+        '_LONG_PRESS', '_MOVE_VELOCITY_SAMPLE', '_SWIPE_TIME',
+        '_SWIPE_VELOCITY', '_TWO_FINGER_SWIPE_START',
+        '_TWO_FINGER_SWIPE_END', '_WHEEL_SENSITIVITY',
+        # derived from the sensitivities, see _gesture_constants()
+        '_INV_DPI', '_DOUBLE_TAP_DISTANCE_SQ', '_LONG_MOVE_THRESHOLD_SQ',
+        '_SWIPE_PIXELS_SQ',
+    )
+
+    # Callbacks defined by the class, see __init_subclass__()
+    _has_move = False
+    _has_velocity = False
+    _has_scale = False
+
+    def __init_subclass__(cls, **kwargs):
+        # Skip the per move work for gestures the subclass ignores
+        super().__init_subclass__(**kwargs)
+        cls._has_move = cls._defines('cg_move_to', 'cg_long_press_move_to',
+                                     'cgb_drag', 'cgb_scroll', 'cgb_pan')
+        cls._has_velocity = cls._defines('cg_move_to',
+                                         'cg_long_press_move_to',
+                                         'cgb_scroll', 'cgb_pan')
+        cls._has_scale = cls._defines('cg_scale', 'cgb_zoom', 'cgb_rotate')
+
+    @classmethod
+    def _defines(cls, *names):
+        return any(getattr(cls, name) is not getattr(CommonGestures, name)
+                   for name in names)
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.mobile = platform == 'android' or platform == 'ios'
+        self.mobile = _IS_MOBILE
         if not self.mobile:
-            Window.bind(on_key_down=self._modifier_key_down)
-            Window.bind(on_key_up=self._modifier_key_up)
+            # ref=True, the Window must not keep this Widget alive
+            Window.fbind('on_key_down', self._modifier_key_down, ref=True)
+            Window.fbind('on_key_up', self._modifier_key_up, ref=True)
 
         # Gesture state
-        self._CTRL = False
-        self._SHIFT = False
-        self._ALT = False
-        self._finger_distance = 0
+        self._mods = 0
+        self._linux_caps_key = False
+        self._finger_distance_squared = 0
         self._finger_angle = 0
         self._wheel_enabled = True
         self._previous_wheel_time = 0
-        self._persistent_pos = [(0, 0), (0, 0)]
+        self._px0 = self._py0 = self._px1 = self._py1 = 0.0
+        self._single_tap_schedule = None
+        # uid: touch, in order of touch down, and the first two touches
+        self._touches = {}
         self._new_gesture()
+        self._move_trigger = Clock.create_trigger(self._flush_move, -1)
+
+        # Widget origin, read on every event, so cache the property values
+        self._origin_x, self._origin_y = self.pos
+        self.fbind('pos', self._refresh_origin)
 
         # Tap Sensitivity
         self._DOUBLE_TAP_TIME = Config.getint('postproc',
@@ -75,6 +257,8 @@ class CommonGestures(Widget):
         self._TWO_FINGER_SWIPE_END = 1/2        # 1/Hz
         self._WHEEL_SENSITIVITY = 1.1           # heuristic
 
+        self._gesture_constants()
+
     '''
     #####################
     # Kivy Touch Events
@@ -88,7 +272,7 @@ class CommonGestures(Widget):
     This is an issue for gestures with persistence, for example two touches.
     So if we have a RelativeLayout we can't rely on the value in touch.pos .
     So regardless of there being a RelativeLayout, we save each touch.pos
-    in self._persistent_pos[] and use that when the current value is
+    in self._px0, _py0, _px1, _py1, and use that when the current value is
     required.
 
     2) A ModalView will inhibit touch events to this underlying Widget.
@@ -103,37 +287,53 @@ class CommonGestures(Widget):
     ##################
     def on_touch_down(self, touch):
         if self.collide_point(touch.x, touch.y):
-            if len(self._touches) == 1 and touch.id == self._touches[0].id:
+            self._flush_move()
+            touches = self._touches
+            if touch.uid in touches or\
+               (len(touches) == 1 and touch.id == self._t0.id):
                 # Filter noise from Kivy, one touch.id touches down twice
                 pass
-            elif platform == 'ios' and 'mouse' in str(touch.id):
+            elif _IS_IOS and _is_mouse(touch):
                 # Filter more noise from Kivy, extra mouse events
                 return super().on_touch_down(touch)
             else:
-                if len(self._touches) == 1 and\
-                   self._gesture_state in ['Long Pressed']:
+                if len(touches) == 1 and\
+                   self._gesture_state == _S_LONG_PRESSED:
                     # Case 2) Previous on_touch_up() was not seen, reset.
-                    self._touches = []
-                    self._gesture_state = 'None'
-                    self._single_tap_schedule = None
-                    self._long_press_schedule = None
-                self._touches.append(touch)
+                    touches.clear()
+                    self._t0 = self._t1 = None
+                    self._gesture_state = _S_NONE
+                    self._not_single_tap()
+                    self._not_long_press()
+                if not touches:
+                    self._gesture_constants()
+                touches[touch.uid] = touch
+                if self._t0 is None:
+                    self._t0 = touch
+                elif self._t1 is None:
+                    self._t1 = touch
 
             if touch.is_mouse_scrolling:
-                self._gesture_state = 'Wheel'
-                x, y = self._pos_to_widget(touch.x, touch.y)
+                self._gesture_state = _S_WHEEL
+                x = touch.x - self._origin_x
+                y = touch.y - self._origin_y
                 scale = self._WHEEL_SENSITIVITY
                 delta_scale = scale - 1
-                if touch.button in ['scrollup', 'scrollleft']:
+                vertical, horizontal, negative, positive =\
+                    _WHEEL_TABLE.get(touch.button, _WHEEL_NONE)
+                if negative:
                     scale = 1/scale
                     delta_scale = -delta_scale
-                vertical = touch.button in ['scrollup', 'scrolldown']
-                horizontal = touch.button in ['scrollleft', 'scrollright']
+                # velocity = distance * inv_period, inches/sec
+                time_update = touch.time_update
+                period = time_update - self._previous_wheel_time
+                inv_period = self._INV_DPI / period if period else 0
 
                 # Event filter
                 global PREVIOUS_PAGE_START
-                delta_t = touch.time_start - PREVIOUS_PAGE_START
-                PREVIOUS_PAGE_START = touch.time_start
+                time_start = touch.time_start
+                delta_t = time_start - PREVIOUS_PAGE_START
+                PREVIOUS_PAGE_START = time_start
                 if delta_t > self._TWO_FINGER_SWIPE_END:
                     # end with slow scroll, or other event
                     self._wheel_enabled = True
@@ -143,215 +343,179 @@ class CommonGestures(Widget):
                    delta_t < self._TWO_FINGER_SWIPE_START:
                     # start with fast scroll
                     self._wheel_enabled = False
-                    if horizontal:
-                        self.cg_swipe_horizontal(touch,
-                                                 touch.button == 'scrollright')
-                        self.cgb_horizontal_page(touch,
-                                                 touch.button == 'scrollright')
-                    else:
-                        self.cg_swipe_vertical(touch,
-                                               touch.button == 'scrollup')
-                        self.cgb_vertical_page(touch,
-                                               touch.button == 'scrollup')
+                    self._SWIPE_TABLE[horizontal](self, touch, positive)
 
                 # Scroll events
                 if vertical:
                     vertical_scroll = True
-                    if self._CTRL:
+                    mods = self._mods
+                    if mods & _MOD_CTRL:
                         vertical_scroll = False
                         self.cg_ctrl_wheel(touch, scale, x, y)
                         self.cgb_zoom(touch, None, x, y, scale)
-                    if self._SHIFT:
+                    if mods & _MOD_SHIFT:
                         vertical_scroll = False
                         self.cg_shift_wheel(touch, scale, x, y)
                         distance = x * delta_scale
-                        period = touch.time_update - self._previous_wheel_time
-                        velocity = 0
-                        if period:
-                            velocity = distance / (period * Metrics.dpi)
-                        self.cgb_pan(touch, x, y, distance, velocity)
-                    if self._ALT:
+                        self.cgb_pan(touch, x, y, distance,
+                                     distance * inv_period)
+                    if mods & _MOD_ALT:
                         vertical_scroll = False
-                        delta_angle = -5
-                        if touch.button == 'scrollup':
-                            delta_angle = - delta_angle
+                        delta_angle = 5 if positive else -5
                         self.cgb_rotate(touch, None, x, y, delta_angle)
                     if vertical_scroll:
                         self.cg_wheel(touch, scale, x, y)
                         distance = y * delta_scale
-                        period = touch.time_update - self._previous_wheel_time
-                        velocity = 0
-                        if period:
-                            velocity = distance / (period * Metrics.dpi)
-                        self.cgb_scroll(touch, x, y, distance, velocity)
+                        self.cgb_scroll(touch, x, y, distance,
+                                        distance * inv_period)
                 elif horizontal:
                     self.cg_shift_wheel(touch, scale, x, y)
                     distance = x * delta_scale
-                    period = touch.time_update - self._previous_wheel_time
-                    velocity = 0
-                    if period:
-                        velocity = distance / (period * Metrics.dpi)
-                    self.cgb_pan(touch, x, y, distance, velocity)
-                self._previous_wheel_time = touch.time_update
-
-            elif len(self._touches) == 1:
-                ox, oy = self._pos_to_widget(touch.ox, touch.oy)
-                self._last_x = ox
-                self._last_y = oy
+                    self.cgb_pan(touch, x, y, distance, distance * inv_period)
+                self._previous_wheel_time = time_update
+
+            elif len(touches) == 1:
+                tx, ty = touch.pos
+                tox, toy = touch.opos
+                self._last_x = tox - self._origin_x
+                self._last_y = toy - self._origin_y
                 self._wheel_enabled = True
                 if 'button' in touch.profile and touch.button == 'right':
                     # Two finger tap or right click
-                    self._gesture_state = 'Right'
+                    self._gesture_state = _S_RIGHT
                 else:
-                    self._gesture_state = 'Left'
+                    self._gesture_state = _S_LEFT
                     # schedule a posssible tap
                     if not self._single_tap_schedule:
-                        self._single_tap_schedule =\
-                            Clock.create_trigger(partial(self._single_tap_event,
-                                                        touch,
-                                                        touch.x, touch.y),
-                                                self._DOUBLE_TAP_TIME)
-                    # schedule a posssible long press
-                    if not self._long_press_schedule:
-                        self._long_press_schedule = Clock.create_trigger(
-                            partial(self._long_press_event,
-                                    touch, touch.x, touch.y,
-                                    touch.ox, touch.oy),
-                            self._LONG_PRESS)
-                    # Hopefully schedules both from the same timestep 
-                    if self._single_tap_schedule:
-                        self._single_tap_schedule()
-                    if self._long_press_schedule:
-                        self._long_press_schedule()
-
-                self._persistent_pos[0] = tuple(touch.pos)
-            elif len(self._touches) == 2:
+                        self._single_tap_args = (touch, tx, ty)
+                        self._single_tap_schedule = _GESTURE_TIMERS.schedule(
+                            self._single_tap_event, self._DOUBLE_TAP_TIME)
+                    # a posssible long press, no Clock event to cancel
+                    if self._long_press_deadline == _NEVER:
+                        self._long_press_deadline =\
+                            touch.time_start + self._LONG_PRESS
+                        self._long_press_args = (touch, tx, ty, tox, toy)
+                        _GESTURE_TIMERS.poll(self._poll_long_press)
+
+                self._px0 = tx
+                self._py0 = ty
+            elif len(touches) == 2:
                 self._wheel_enabled = True
-                self._gesture_state = 'Right'  # scale, or rotate
+                self._gesture_state = _S_RIGHT  # scale, or rotate
                 # If two fingers it cant be a long press, swipe or tap
                 self._not_long_press()
                 self._not_single_tap()
-                self._persistent_pos[1] = tuple(touch.pos)
+                self._px1 = touch.x
+                self._py1 = touch.y
                 x, y = self._scale_midpoint()
-                self.cg_scale_start(self._touches[0], self._touches[1], x, y)
-            elif len(self._touches) == 3:
+                self.cg_scale_start(self._t0, self._t1, x, y)
+            elif len(touches) == 3:
                 # Another bogus Kivy event
                 # Occurs on desktop pinch/spread when touchpad reports
                 # the touch points and not ctrl-scroll
                 td = None
-                for t in self._touches:
-                    if 'mouse' in str(t.id):
+                for t in touches.values():
+                    if _is_mouse(t):
                         td = t
                 if td:
                     self._remove_gesture(td)
-                    self._persistent_pos[0] = tuple(self._touches[0].pos)
-                    self._persistent_pos[1] = tuple(self._touches[1].pos)
+                    self._px0 = self._t0.x
+                    self._py0 = self._t0.y
+                    self._px1 = self._t1.x
+                    self._py1 = self._t1.y
 
         return super().on_touch_down(touch)
 
     #   touch move
     #################
     def on_touch_move(self, touch):
-        if touch in self._touches and self.collide_point(touch.x, touch.y):
+        touches = self._touches
+        if touch.uid in touches and\
+           self.collide_point(touch.x, touch.y):
+            if touch.time_update >= self._long_press_deadline:
+                # The long press expired before this move, and
+                # before the next poll.
+                self._poll_long_press()
+            dx = touch.dx
+            dy = touch.dy
             # Old Android screens give noisy touch events
             # which can kill a long press.
-            if (not self.mobile and (touch.dx or touch.dy)) or\
-               (self.mobile and not self._long_press_schedule and
-                (touch.dx or touch.dy)) or\
-               (self.mobile and (abs(touch.dx) > self._LONG_MOVE_THRESHOLD or
-                                 abs(touch.dy) > self._LONG_MOVE_THRESHOLD)):
+            # A move is any motion on desktop, or while no long press is
+            # pending, otherwise motion over the threshold distance.
+            if (dx or dy) and\
+               (not self.mobile or self._long_press_deadline == _NEVER or
+                dx * dx + dy * dy > self._LONG_MOVE_THRESHOLD_SQ):
                 # If moving it cant be a pending long press or tap
                 self._not_long_press()
                 self._not_single_tap()
+                tx, ty = touch.pos
+                tox, toy = touch.opos
+                sx = self._origin_x
+                sy = self._origin_y
+                state = self._gesture_state
                 # State changes
-                if self._gesture_state == 'Long Pressed':
-                    self._gesture_state = 'Long Press Move'
-                    x, y = self._pos_to_widget(touch.ox, touch.oy)
+                if state == _S_LONG_PRESSED:
+                    self._gesture_state = state = _S_LONG_PRESS_MOVE
+                    x = tox - sx
+                    y = toy - sy
                     self._velocity_start(touch)
                     self.cg_long_press_move_start(touch, x, y)
 
-                elif self._gesture_state == 'Left':
+                elif state == _S_LEFT:
                     # Moving 'Left' is a drag, or a page
-                    self._gesture_state = 'Disambiguate'
-                    x, y = self._pos_to_widget(touch.ox, touch.oy)
+                    self._gesture_state = state = _S_DISAMBIGUATE
+                    x = tox - sx
+                    y = toy - sy
                     self._velocity_start(touch)
                     self.cg_move_start(touch, x, y)
 
-                if self._gesture_state == 'Disambiguate' and\
-                   len(self._touches) == 1:
-                    self._gesture_state = 'Move'
+                if state == _S_DISAMBIGUATE and len(touches) == 1:
+                    self._gesture_state = state = _S_MOVE
                     # schedule a posssible swipe
                     if not self._swipe_schedule:
-                        self._swipe_schedule = Clock.schedule_once(
-                            partial(self._possible_swipe, touch),
-                            self._SWIPE_TIME)
-
-                if self._gesture_state in ['Right', 'Scale']:
-                    if len(self._touches) <= 2:
-                        indx = self._touches.index(touch)
-                        self._persistent_pos[indx] = tuple(touch.pos)
-                    if len(self._touches) > 1:
-                        self._gesture_state = 'Scale'  # and rotate
-                        finger_distance = self._scale_distance()
-                        f = self._scale_angle()
-                        if f >= 0:
-                            finger_angle = f
-                        else:  # Div zero in angle calc
-                            finger_angle = self._finger_angle
-                        if self._finger_distance:
-                            scale = finger_distance / self._finger_distance
-                            x, y = self._scale_midpoint()
-                            if abs(scale) != 1:
-                                self.cg_scale(self._touches[0],
-                                              self._touches[1],
-                                              scale, x, y)
-                                self.cgb_zoom(self._touches[0],
-                                              self._touches[1],
-                                              x, y, scale)
-                            delta_angle = self._finger_angle - finger_angle
-                            # wrap around
-                            if delta_angle < -170:
-                                delta_angle += 180
-                            if delta_angle > 170:
-                                delta_angle -= 180
-                            if delta_angle:
-                                self.cgb_rotate(self._touches[0],
-                                                self._touches[1],
-                                                x, y, delta_angle)
-                        self._finger_distance = finger_distance
-                        self._finger_angle = finger_angle
-
-                else:
-                    x, y = self._pos_to_widget(touch.x, touch.y)
-                    delta_x = x - self._last_x
-                    delta_y = y - self._last_y
-                    if self._gesture_state == 'Move' and self.mobile:
+                        self._swipe_schedule = _GESTURE_TIMERS.schedule(
+                            self._possible_swipe, self._SWIPE_TIME, touch)
+
+                if state in (_S_RIGHT, _S_SCALE):
+                    if touch is self._t0:
+                        self._px0 = tx
+                        self._py0 = ty
+                    elif touch is self._t1:
+                        self._px1 = tx
+                        self._py1 = ty
+                    if self._t1 is not None:
+                        self._gesture_state = _S_SCALE  # and rotate
+                        if self._has_scale:
+                            self._pending_scale = True
+                            self._move_trigger()
+
+                elif self._has_move:
+                    # Save the widget relative values now, see 1) above
+                    x = tx - sx
+                    y = ty - sy
+                    ox = tox - sx
+                    oy = toy - sy
+                    v = 0
+                    if self._has_velocity and\
+                       state in (_S_MOVE, _S_LONG_PRESS_MOVE):
                         v = self._velocity_now(touch)
-                        self.cg_move_to(touch, x, y, v)
-                        ox, oy = self._pos_to_widget(touch.ox, touch.oy)
-                        if abs(x - ox) > abs(y - oy):
-                            self.cgb_pan(touch, x, y, delta_x, v)
-                        else:
-                            self.cgb_scroll(touch, x, y, delta_y, v)
-                    elif self._gesture_state == 'Long Press Move' or\
-                         (self._gesture_state == 'Move' and not self.mobile):
-                        self.cg_long_press_move_to(touch, x, y,
-                                                   self._velocity_now(touch))
-                        self.cgb_drag(touch, x, y, delta_x, delta_y)
-                    self._last_x = x
-                    self._last_y = y
+                    self._pending_move = (touch, x, y, ox, oy, v)
+                    self._move_trigger()
 
         return super().on_touch_move(touch)
 
     #   touch up
     ###############
     def on_touch_up(self, touch):
-        if touch in self._touches:
+        if touch.uid in self._touches:
+            self._flush_move()
 
             self._not_long_press()
-            x, y = self._pos_to_widget(touch.x, touch.y)
+            x = touch.x - self._origin_x
+            y = touch.y - self._origin_y
+            state = self._gesture_state
 
-            if self._gesture_state == 'Left':
+            if state == _S_LEFT:
                 if touch.is_double_tap:
                     self._not_single_tap()
                     self.cg_double_tap(touch, x, y)
@@ -360,30 +524,30 @@ class CommonGestures(Widget):
                 else:
                     self._remove_gesture(touch)
 
-            elif self._gesture_state == 'Right':
+            elif state == _S_RIGHT:
                 self.cg_two_finger_tap(touch, x, y)
                 self.cgb_secondary(touch, x, y)
                 self._new_gesture()
 
-            elif self._gesture_state == 'Scale':
-                self.cg_scale_end(self._touches[0], self._touches[1])
+            elif state == _S_SCALE:
+                self.cg_scale_end(self._t0, self._t1)
                 self._new_gesture()
 
-            elif self._gesture_state == 'Long Press Move':
+            elif state == _S_LONG_PRESS_MOVE:
                 self.cg_long_press_move_end(touch, x, y)
                 self.cgb_long_press_end(touch, x, y)
                 self._new_gesture()
 
-            elif self._gesture_state == 'Move':
+            elif state == _S_MOVE:
                 self.cg_move_end(touch, x, y)
                 self._new_gesture()
 
-            elif self._gesture_state == 'Long Pressed':
+            elif state == _S_LONG_PRESSED:
                 self.cg_long_press_end(touch, x, y)
                 self.cgb_long_press_end(touch, x, y)
                 self._new_gesture()
 
-            elif self._gesture_state in ['Wheel', 'Disambiguate', 'Swipe']:
+            elif state in (_S_WHEEL, _S_DISAMBIGUATE, _S_SWIPE):
                 self._new_gesture()
 
         return super().on_touch_up(touch)
@@ -395,25 +559,36 @@ class CommonGestures(Widget):
     #   long press clock
     ########################
 
-    def _long_press_event(self, touch, x, y, ox, oy, dt):
-        self._long_press_schedule = None
-        distance_squared = (x - ox) ** 2 + (y - oy) ** 2
-        if distance_squared < self._DOUBLE_TAP_DISTANCE ** 2:
+    def _poll_long_press(self):
+        # Called by _GESTURE_TIMERS every frame, until it returns False
+        if self._long_press_deadline == _NEVER:
+            return False
+        if time() < self._long_press_deadline:
+            return True
+        args = self._long_press_args
+        self._not_long_press()
+        self._long_press_event(*args)
+        return False
+
+    def _long_press_event(self, touch, x, y, ox, oy):
+        if _distance_squared(x, y, ox, oy) < self._DOUBLE_TAP_DISTANCE_SQ:
             x, y = self._pos_to_widget(x, y)
             self.cg_long_press(touch, x, y)
             self.cgb_select(touch, x, y, True)
-            self._gesture_state = 'Long Pressed'
+            self._gesture_state = _S_LONG_PRESSED
 
     def _not_long_press(self):
-        if self._long_press_schedule:
-            Clock.unschedule(self._long_press_schedule)
-            self._long_press_schedule = None
+        self._long_press_deadline = _NEVER
+        self._long_press_args = None
 
     #   single tap clock
     #######################
-    def _single_tap_event(self, touch, x, y, dt):
-        if self._gesture_state == 'Left':
-            if not self._long_press_schedule:
+    def _single_tap_event(self, dt):
+        self._single_tap_schedule = None
+        touch, x, y = self._single_tap_args
+        self._single_tap_args = None
+        if self._gesture_state == _S_LEFT:
+            if self._long_press_deadline == _NEVER:
                 x, y = self._pos_to_widget(x, y)
                 self.cg_tap(touch, x, y)
                 self.cgb_primary(touch, x, y)
@@ -421,33 +596,95 @@ class CommonGestures(Widget):
 
     def _not_single_tap(self):
         if self._single_tap_schedule:
-            Clock.unschedule(self._single_tap_schedule)
+            _GESTURE_TIMERS.cancel(self._single_tap_schedule)
             self._single_tap_schedule = None
+            self._single_tap_args = None
+
+    #   move coalescing
+    #######################
+    # A touch screen may report moves faster than the frame rate.
+    # on_touch_move() saves the latest move, and the move callbacks
+    # are called at most once per frame, before the frame is drawn.
+    # Pending moves are flushed before any other touch event.
+
+    def _flush_move(self, dt=0):
+        if self._pending_scale:
+            self._pending_scale = False
+            if self._t1 is not None:
+                self._scale_move()
+        if self._pending_move:
+            pending = self._pending_move
+            self._pending_move = None
+            self._one_finger_move(*pending)
+
+    def _scale_move(self):
+        finger_distance_squared = self._scale_distance_squared()
+        finger_angle = self._scale_angle()
+        if self._finger_distance_squared:
+            scale = sqrt(finger_distance_squared /
+                         self._finger_distance_squared)
+            x, y = self._scale_midpoint()
+            t0 = self._t0
+            t1 = self._t1
+            if abs(scale) != 1:
+                self.cg_scale(t0, t1, scale, x, y)
+                self.cgb_zoom(t0, t1, x, y, scale)
+            # wrap around, to -180 <= delta_angle < 180
+            delta_angle = (self._finger_angle - finger_angle + 180) % 360 - 180
+            if delta_angle:
+                self.cgb_rotate(t0, t1, x, y, delta_angle)
+        self._finger_distance_squared = finger_distance_squared
+        self._finger_angle = finger_angle
+
+    def _one_finger_move(self, touch, x, y, ox, oy, v):
+        delta_x = x - self._last_x
+        delta_y = y - self._last_y
+        if self._gesture_state == _S_MOVE and self.mobile:
+            self.cg_move_to(touch, x, y, v)
+            if abs(x - ox) > abs(y - oy):
+                self.cgb_pan(touch, x, y, delta_x, v)
+            else:
+                self.cgb_scroll(touch, x, y, delta_y, v)
+        elif self._gesture_state == _S_LONG_PRESS_MOVE or\
+             (self._gesture_state == _S_MOVE and not self.mobile):
+            self.cg_long_press_move_to(touch, x, y, v)
+            self.cgb_drag(touch, x, y, delta_x, delta_y)
+        self._last_x = x
+        self._last_y = y
 
     #   swipe clock
     #######################
+    def _swipe_vertical(self, touch, bottom_to_top):
+        self.cg_swipe_vertical(touch, bottom_to_top)
+        self.cgb_vertical_page(touch, bottom_to_top)
+
+    def _swipe_horizontal(self, touch, left_to_right):
+        self.cg_swipe_horizontal(touch, left_to_right)
+        self.cgb_horizontal_page(touch, left_to_right)
+
+    # indexed by horizontal
+    _SWIPE_TABLE = (_swipe_vertical, _swipe_horizontal)
+
     def _possible_swipe(self, touch, dt):
         self._swipe_schedule = None
+        self._flush_move()
         x, y = touch.pos
         ox, oy = touch.opos
         period = touch.time_update - touch.time_start
-        distance = sqrt((x - ox) ** 2 + (y - oy) ** 2)
-        if period:
-            velocity = distance / (period * Metrics.dpi)
-        else:
-            velocity = 0
+        distance_squared = _distance_squared(x, y, ox, oy)
 
-        if velocity > self._SWIPE_VELOCITY:
+        # velocity = distance / (period * dpi), compared without a sqrt
+        if period and\
+           distance_squared > self._SWIPE_PIXELS_SQ * period * period:
             # A Swipe pre-empts a Move, so reset the Move
             wox, woy = self._pos_to_widget(ox, oy)
             self.cg_move_to(touch, wox, woy, self._velocity)
             self.cg_move_end(touch, wox, woy)
-            if self.touch_horizontal(touch):
-                self.cg_swipe_horizontal(touch, x-ox > 0)
-                self.cgb_horizontal_page(touch, x-ox > 0)
-            else:
-                self.cg_swipe_vertical(touch, y-oy > 0)
-                self.cgb_vertical_page(touch, y-oy > 0)
+            dx = x - ox
+            dy = y - oy
+            horizontal = abs(dx) > abs(dy)
+            positive = (dx if horizontal else dy) > 0
+            self._SWIPE_TABLE[horizontal](self, touch, positive)
             self._new_gesture()
 
     def _velocity_start(self, touch):
@@ -455,15 +692,14 @@ class CommonGestures(Widget):
         self._velt = touch.time_start
 
     def _velocity_now(self, touch):
-        period = touch.time_update - self._velt
         x, y = touch.pos
-        distance = sqrt((x - self._velx) ** 2 + (y - self._vely) ** 2)
-        self._velt = touch.time_update
-        self._velx, self._vely = touch.pos
-        if period:
-            return distance / (period * Metrics.dpi)
-        else:
-            return 0
+        t = touch.time_update
+        velocity = _velocity(self._velx, self._vely, self._velt, x, y, t,
+                             self._INV_DPI)
+        self._velx = x
+        self._vely = y
+        self._velt = t
+        return velocity
 
     #  Touch direction
     ######################
@@ -475,65 +711,76 @@ class CommonGestures(Widget):
 
     #  Two finger touch
     ######################
-    def _scale_distance(self):
-        x0, y0 = self._persistent_pos[0]
-        x1, y1 = self._persistent_pos[1]
-        return sqrt((x0 - x1) ** 2 + (y0 - y1) ** 2)
+    def _scale_distance_squared(self):
+        # scale is the sqrt of a ratio of these, one sqrt per move
+        return _distance_squared(self._px0, self._py0, self._px1, self._py1)
 
     def _scale_angle(self):
-        x0, y0 = self._persistent_pos[0]
-        x1, y1 = self._persistent_pos[1]
-        if y0 == y1:
-            return -90  # NOP
-        return 90 + degrees(atan((x0 - x1) / (y0 - y1)))
+        return _angle(self._px0, self._py0, self._px1, self._py1)
 
     def _scale_midpoint(self):
-        x0, y0 = self._persistent_pos[0]
-        x1, y1 = self._persistent_pos[1]
-        midx = abs(x0 - x1) / 2 + min(x0, x1)
-        midy = abs(y0 - y1) / 2 + min(y0, y1)
-        # convert to widget
-        x = midx - self.x
-        y = midy - self.y
+        # mid point, converted to widget
+        x, y = _midpoint(self._px0, self._py0, self._px1, self._py1)
+        x -= self._origin_x
+        y -= self._origin_y
         return x, y
 
     #   Every result is in the self frame
     #########################################
     def _pos_to_widget(self, x, y):
-        return (x - self.x, y - self.y)
+        return (x - self._origin_x, y - self._origin_y)
+
+    def _refresh_origin(self, instance, pos):
+        self._origin_x, self._origin_y = pos
 
     #   gesture utilities
     ########################
     def _remove_gesture(self, touch):
-        if touch and len(self._touches):
-            if touch in self._touches:
-                self._touches.remove(touch)
+        touches = self._touches
+        if touch and touch.uid in touches:
+            del touches[touch.uid]
+            if touch is self._t0 or touch is self._t1:
+                # the first two remaining touches, in touch down order
+                first = iter(touches.values())
+                self._t0 = next(first, None)
+                self._t1 = next(first, None)
 
     def _new_gesture(self):
-        self._touches = []
-        self._long_press_schedule = None
-        self._single_tap_schedule = None
-        self._velocity_schedule = None
-        self._swipe_schedule = None
-        self._gesture_state = 'None'
-        self._finger_distance = 0
-        self._velocity = 0
+        self._touches.clear()
+        self._t0 = self._t1 = self._long_press_args = None
+        self._swipe_schedule = self._pending_move = None
+        self._long_press_deadline = _NEVER
+        # the tap arguments are saved, so the tap timer can't outlive them
+        self._not_single_tap()
+        self._gesture_state = _S_NONE
+        self._finger_distance_squared = self._velocity = 0
+        self._pending_scale = False
+
+    def _gesture_constants(self):
+        # Read at the start of each gesture, not on each event.
+        # The sensitivities may be changed after __init__()
+        dpi = Metrics.dpi
+        self._INV_DPI = 1 / dpi
+        self._DOUBLE_TAP_DISTANCE_SQ = self._DOUBLE_TAP_DISTANCE ** 2
+        self._LONG_MOVE_THRESHOLD_SQ = self._LONG_MOVE_THRESHOLD ** 2
+        # pixels/sec, squared
+        self._SWIPE_PIXELS_SQ = (self._SWIPE_VELOCITY * dpi) ** 2
 
     # Modiier key detect
     def _modifier_key_down(self, a, b, c, d, modifiers):
-        command_key = platform == 'macosx' and 'meta' in modifiers
-        self._linux_caps_key = platform == 'linux' and 'capslock' in modifiers
-        if 'ctrl' in modifiers or command_key:
-            self._CTRL = True
-        elif 'shift' in modifiers:
-            self._SHIFT = True
-        elif 'alt' in modifiers or self._linux_caps_key:
-            self._ALT = True
+        # One handler sets every flag, modifiers may be combined
+        self._linux_caps_key = _IS_LINUX and 'capslock' in modifiers
+        mods = 0
+        if 'ctrl' in modifiers or (_IS_MACOSX and 'meta' in modifiers):
+            mods |= _MOD_CTRL
+        if 'shift' in modifiers:
+            mods |= _MOD_SHIFT
+        if 'alt' in modifiers or self._linux_caps_key:
+            mods |= _MOD_ALT
+        self._mods = mods
 
     def _modifier_key_up(self,a, b, c):
-        self._CTRL = False
-        self._SHIFT = False
-        self._ALT = self._linux_caps_key
+        self._mods = _MOD_ALT if self._linux_caps_key else 0
 
     ############################################
     # User Events